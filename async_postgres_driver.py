@@ -0,0 +1,273 @@
+import os
+import asyncpg
+from asyncpg import PostgresError
+from dotenv import load_dotenv
+from schema import SCHEMA_STATEMENTS, MIGRATE_ORDERS_AMOUNT_TO_CENTS, check_amount_cents
+from typing import Dict, List, Tuple, Optional
+from datetime import datetime
+
+# Параметры подключения читаются из окружения (.env) один раз при импорте модуля
+load_dotenv()
+_DB_PARAMS: Dict[str, str] = {
+    "host": os.getenv("DB_HOST", "localhost"),
+    "port": os.getenv("DB_PORT", "5432"),
+    "database": os.getenv("DB_NAME", "test"),
+    "user": os.getenv("DB_USER", "postgres"),
+    "password": os.getenv("DB_PASSWORD", ""),
+}
+
+
+class AsyncPostgresDriver:
+    """Асинхронный драйвер для работы с PostgreSQL на основе asyncpg"""
+
+    def __init__(self, **connect_params: str):
+        """
+        Инициализация драйвера
+
+        Args:
+            **connect_params: Параметры подключения, переопределяющие значения
+                из окружения (host, port, database, user, password)
+        """
+        self._connect_params = {**_DB_PARAMS, **connect_params}
+        self.pool = None
+
+    async def connect(self) -> bool:
+        """
+        Создание пула подключений к базе данных
+
+        Returns:
+            bool: True если подключение успешно, False в противном случае
+        """
+        try:
+            self.pool = await asyncpg.create_pool(
+                **self._connect_params,
+                # JIT не окупается на коротких запросах, а подготовленные выражения
+                # сразу используют общий (закешированный) план без перепланирования
+                server_settings={"jit": "off", "plan_cache_mode": "force_generic_plan"},
+                min_size=4,
+                max_size=20
+            )
+            return True
+        except (PostgresError, OSError) as e:
+            print(f"❌ Ошибка подключения: {e}")
+            return False
+
+    async def disconnect(self) -> None:
+        """Закрытие пула подключений"""
+        if self.pool:
+            await self.pool.close()
+            self.pool = None
+
+    async def __aenter__(self):
+        """Асинхронный контекстный менеджер для автоматического подключения"""
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Асинхронный контекстный менеджер для автоматического отключения"""
+        await self.disconnect()
+
+    async def create_tables(self) -> bool:
+        """
+        Создание таблиц users и orders
+
+        Безопасно вызывать повторно. Если таблица orders существует в старом формате
+        (столбец amount NUMERIC в рублях), схема не создается и метод возвращает False:
+        сначала нужно явно вызвать migrate_amounts_to_cents().
+
+        Returns:
+            bool: True если таблицы созданы успешно
+        """
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    for statement in SCHEMA_STATEMENTS:
+                        await conn.execute(statement)
+                return True
+
+        except PostgresError as e:
+            print(f"❌ Ошибка при создании таблиц: {e}")
+            return False
+
+    async def migrate_amounts_to_cents(self) -> bool:
+        """
+        Перевод таблицы orders старого формата на суммы в копейках
+
+        Необратимо: столбец amount NUMERIC (рубли) переименовывается в amount_cents,
+        а значения умножаются на 100 и приводятся к BIGINT. На таблице нового
+        формата ничего не делает.
+
+        Returns:
+            bool: True если миграция выполнена успешно (или не требовалась)
+        """
+        try:
+            async with self.pool.acquire() as conn:
+                await conn.execute(MIGRATE_ORDERS_AMOUNT_TO_CENTS)
+                return True
+
+        except PostgresError as e:
+            print(f"❌ Ошибка при переводе сумм заказов в копейки: {e}")
+            return False
+
+    async def add_user(self, name: str, age: int) -> Optional[int]:
+        """
+        Добавление нового пользователя
+
+        Args:
+            name: Имя пользователя
+            age: Возраст пользователя
+
+        Returns:
+            int: ID созданного пользователя или None в случае ошибки
+        """
+        try:
+            async with self.pool.acquire() as conn:
+                return await conn.fetchval(
+                    "INSERT INTO users (name, age) VALUES ($1, $2) RETURNING id;",
+                    name, age
+                )
+        except PostgresError as e:
+            print(f"❌ Ошибка при добавлении пользователя: {e}")
+            return None
+
+    async def add_order(self, user_id: int, amount_cents: int) -> Optional[int]:
+        """
+        Добавление нового заказа
+
+        Args:
+            user_id: ID пользователя
+            amount_cents: Сумма заказа в копейках
+
+        Returns:
+            int: ID созданного заказа или None в случае ошибки
+
+        Raises:
+            TypeError: Сумма заказа не является целым числом копеек
+        """
+        check_amount_cents(amount_cents)
+        try:
+            async with self.pool.acquire() as conn:
+                return await conn.fetchval(
+                    "INSERT INTO orders (user_id, amount_cents) VALUES ($1, $2) RETURNING id;",
+                    user_id, amount_cents
+                )
+        except PostgresError as e:
+            print(f"❌ Ошибка при добавлении заказа: {e}")
+            return None
+
+    async def get_user_totals(self) -> List[Tuple[str, int]]:
+        """
+        Получение суммы заказов по каждому пользователю
+
+        Returns:
+            List[Tuple[str, int]]: Список кортежей (имя_пользователя, сумма_заказов_в_копейках)
+        """
+        try:
+            async with self.pool.acquire() as conn:
+                rows = await conn.fetch("""
+                    SELECT
+                        u.name,
+                        COALESCE(SUM(o.amount_cents), 0)::bigint as total_cents
+                    FROM users u
+                    LEFT JOIN orders o ON u.id = o.user_id
+                    GROUP BY u.id, u.name
+                    ORDER BY total_cents DESC, u.name;
+                """)
+                return [tuple(row) for row in rows]
+        except PostgresError as e:
+            print(f"❌ Ошибка при получении статистики: {e}")
+            return []
+
+    async def get_all_users(self, limit: Optional[int] = None,
+                            after_id: Optional[int] = None) -> List[Tuple[int, str, int]]:
+        """
+        Получение пользователей (постранично по возрастанию id)
+
+        Args:
+            limit: Максимальное количество пользователей (None - без ограничения)
+            after_id: ID последнего пользователя предыдущей страницы
+
+        Returns:
+            List[Tuple[int, str, int]]: Список пользователей (id, name, age)
+        """
+        try:
+            async with self.pool.acquire() as conn:
+                if after_id is None:
+                    rows = await conn.fetch(
+                        "SELECT id, name, age FROM users ORDER BY id LIMIT $1;",
+                        limit
+                    )
+                else:
+                    rows = await conn.fetch(
+                        "SELECT id, name, age FROM users WHERE id > $1 ORDER BY id LIMIT $2;",
+                        after_id, limit
+                    )
+                return [tuple(row) for row in rows]
+        except PostgresError as e:
+            print(f"❌ Ошибка при получении пользователей: {e}")
+            return []
+
+    async def get_user_orders(self, user_id: int, limit: Optional[int] = 100,
+                              after_id: Optional[int] = None) -> List[Tuple[int, int, datetime]]:
+        """
+        Получение заказов пользователя (постранично по возрастанию id)
+
+        Args:
+            user_id: ID пользователя
+            limit: Максимальное количество заказов (None - без ограничения)
+            after_id: ID последнего заказа предыдущей страницы
+
+        Returns:
+            List[Tuple[int, int, datetime]]: Список заказов (id, amount_cents, created_at)
+        """
+        try:
+            async with self.pool.acquire() as conn:
+                if after_id is None:
+                    rows = await conn.fetch(
+                        "SELECT id, amount_cents, created_at FROM orders WHERE user_id = $1 ORDER BY id LIMIT $2;",
+                        user_id, limit
+                    )
+                else:
+                    rows = await conn.fetch(
+                        "SELECT id, amount_cents, created_at FROM orders"
+                        " WHERE user_id = $1 AND id > $2 ORDER BY id LIMIT $3;",
+                        user_id, after_id, limit
+                    )
+                return [tuple(row) for row in rows]
+        except PostgresError as e:
+            print(f"❌ Ошибка при получении заказов пользователя: {e}")
+            return []
+
+    async def delete_user(self, user_id: int) -> bool:
+        """
+        Удаление пользователя (с каскадным удалением заказов)
+
+        Args:
+            user_id: ID пользователя
+
+        Returns:
+            bool: True если удаление успешно
+        """
+        try:
+            async with self.pool.acquire() as conn:
+                status = await conn.execute("DELETE FROM users WHERE id = $1;", user_id)
+                # Статус команды имеет вид "DELETE <количество_строк>"
+                return int(status.split()[-1]) > 0
+        except PostgresError as e:
+            print(f"❌ Ошибка при удалении пользователя: {e}")
+            return False
+
+    async def clear_tables(self) -> bool:
+        """
+        Очистка всех таблиц (удаление всех данных и сброс счетчиков id)
+
+        Returns:
+            bool: True если очистка успешна
+        """
+        try:
+            async with self.pool.acquire() as conn:
+                await conn.execute("TRUNCATE TABLE orders, users RESTART IDENTITY CASCADE;")
+                return True
+        except PostgresError as e:
+            print(f"❌ Ошибка при очистке таблиц: {e}")
+            return False
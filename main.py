@@ -2,153 +2,153 @@
 Пример использования драйвера PostgreSQL для работы с пользователями и заказами
 """
 
-from postgres_driver import PostgresDriver
+from itertools import islice
 
+from postgres_driver import PostgresDriver, close_pools
 
-def demonstrate_crud_operations():
+# Количество пользователей, заказы которых загружаются одним запросом
+USERS_CHUNK_SIZE = 1000
+
+
+def demonstrate_crud_operations(db: PostgresDriver):
     """Демонстрация CRUD операций"""
 
     print("=" * 50)
     print("ДЕМОНСТРАЦИЯ РАБОТЫ С POSTGRESQL ЧЕРЕЗ ДРАЙВЕР")
     print("=" * 50)
 
-    # Способ 1: Использование контекстного менеджера (рекомендуется)
-    print("\n1. Использование контекстного менеджера:")
+    print("\n1. Добавление пользователей и заказов:")
+    print("-" * 40)
+
+    # Создаем таблицы
+    if not db.create_tables():
+        raise RuntimeError("Не удалось создать таблицы users и orders")
+    print("✅ Таблицы users и orders созданы")
+
+    # Добавляем пользователей
+    users_data = [
+        ("Анна Петрова", 25),
+        ("Иван Сидоров", 30),
+        ("Мария Иванова", 28),
+        ("Алексей Козлов", 35)
+    ]
+
+    # Все пользователи добавляются одним запросом
+    user_ids = db.add_users_bulk(users_data)
+    for (name, age), user_id in zip(users_data, user_ids):
+        print(f"✅ Добавлен пользователь: {name} (ID: {user_id}, возраст: {age})")
+
+    # Добавляем заказы (суммы в копейках)
+    orders_data = [
+        (user_ids[0], 125050),  # Анна
+        (user_ids[0], 49990),  # Анна
+        (user_ids[1], 75000),  # Иван
+        (user_ids[1], 120000),  # Иван
+        (user_ids[1], 30050),  # Иван
+        (user_ids[2], 150000),  # Мария
+        # У Алексея нет заказов
+    ]
+
+    order_ids = db.add_orders_bulk(orders_data)
+    for (user_id, amount_cents), order_id in zip(orders_data, order_ids):
+        print(f"✅ Добавлен заказ: ID {order_id}, сумма {amount_cents / 100:.2f} руб.")
+
+    # Получаем статистику
+    print("\n2. Статистика заказов по пользователям:")
+    print("-" * 40)
+
+    totals = db.get_user_totals()
+    for name, total_cents in totals:
+        print(f"   {name}: {total_cents / 100:>10.2f} руб.")
+
+    # Показываем детали по каждому пользователю
+    print("\n3. Детальная информация по пользователям:")
     print("-" * 40)
 
-    with PostgresDriver() as db:
-        # Создаем таблицы
-        if db.create_tables():
-            print("✅ Таблицы users и orders созданы")
-
-        # Добавляем пользователей
-        users_data = [
-            ("Анна Петрова", 25),
-            ("Иван Сидоров", 30),
-            ("Мария Иванова", 28),
-            ("Алексей Козлов", 35)
-        ]
-
-        user_ids = []
-        for name, age in users_data:
-            user_id = db.add_user(name, age)
-            if user_id:
-                user_ids.append(user_id)
-                print(f"✅ Добавлен пользователь: {name} (ID: {user_id}, возраст: {age})")
-
-        # Добавляем заказы
-        orders_data = [
-            (user_ids[0], 1250.50),  # Анна
-            (user_ids[0], 499.90),  # Анна
-            (user_ids[1], 750.00),  # Иван
-            (user_ids[1], 1200.00),  # Иван
-            (user_ids[1], 300.50),  # Иван
-            (user_ids[2], 1500.00),  # Мария
-            # У Алексея нет заказов
-        ]
-
-        for user_id, amount in orders_data:
-            order_id = db.add_order(user_id, amount)
-            if order_id:
-                print(f"✅ Добавлен заказ: ID {order_id}, сумма {amount:.2f} руб.")
-
-        # Получаем статистику
-        print("\n2. Статистика заказов по пользователям:")
-        print("-" * 40)
-
-        totals = db.get_user_totals()
-        for name, total in totals:
-            print(f"   {name}: {total:>10.2f} руб.")
-
-        # Показываем детали по каждому пользователю
-        print("\n3. Детальная информация по пользователям:")
-        print("-" * 40)
-
-        for user_id, name, age in db.get_all_users():
-            orders = db.get_user_orders(user_id)
+    # Пользователи читаются потоком, а заказы загружаются одним запросом
+    # на порцию пользователей, а не отдельным запросом на каждого
+    users = db.iter_users()
+    while True:
+        chunk = list(islice(users, USERS_CHUNK_SIZE))
+        if not chunk:
+            break
+        orders_by_user = db.get_orders_for_users([user_id for user_id, _, _ in chunk])
+
+        for user_id, name, age in chunk:
+            orders = orders_by_user.get(user_id, [])
             order_count = len(orders)
             print(f"\n   👤 {name} (возраст: {age})")
             print(f"   📊 Заказов: {order_count}")
 
             if orders:
-                total = sum(order[1] for order in orders)
-                print(f"   💰 Общая сумма: {total:.2f} руб.")
+                total_cents = sum(order[1] for order in orders)
+                print(f"   💰 Общая сумма: {total_cents / 100:.2f} руб.")
                 print(f"   📝 Список заказов:")
-                for order_id, amount, created_at in orders:
-                    print(f"      • Заказ #{order_id}: {amount:.2f} руб. ({created_at.strftime('%d.%m.%Y %H:%M')})")
+                for order_id, amount_cents, created_at in orders:
+                    print(f"      • Заказ #{order_id}: {amount_cents / 100:.2f} руб. ({created_at.strftime('%d.%m.%Y %H:%M')})")
             else:
                 print(f"   💰 Общая сумма: 0.00 руб.")
                 print(f"   📝 Заказов нет")
 
-        # Демонстрация каскадного удаления
-        print("\n4. Демонстрация каскадного удаления:")
-        print("-" * 40)
+    # Демонстрация каскадного удаления
+    print("\n4. Демонстрация каскадного удаления:")
+    print("-" * 40)
 
-        # Сначала покажем сколько заказов у пользователя
-        test_user_id = user_ids[1]  # Иван (у него 3 заказа)
-        orders_before = db.get_user_orders(test_user_id)
-        print(f"   У пользователя ID {test_user_id} сейчас {len(orders_before)} заказов")
+    # Сначала покажем сколько заказов у пользователя
+    test_user_id = user_ids[1]  # Иван (у него 3 заказа)
+    orders_before = db.get_user_orders(test_user_id)
+    print(f"   У пользователя ID {test_user_id} сейчас {len(orders_before)} заказов")
 
-        # Удаляем пользователя
-        if db.delete_user(test_user_id):
-            print(f"   ✅ Пользователь ID {test_user_id} удален")
+    # Удаляем пользователя
+    if db.delete_user(test_user_id):
+        print(f"   ✅ Пользователь ID {test_user_id} удален")
 
-            # Проверяем, что заказы тоже удалились
-            print(f"   Проверка: заказы автоматически удалены благодаря ON DELETE CASCADE")
+        # Проверяем, что заказы тоже удалились
+        print(f"   Проверка: заказы автоматически удалены благодаря ON DELETE CASCADE")
 
-        # Финальная статистика
-        print("\n5. Финальная статистика:")
-        print("-" * 40)
+    # Финальная статистика
+    print("\n5. Финальная статистика:")
+    print("-" * 40)
 
-        final_totals = db.get_user_totals()
-        for name, total in final_totals:
-            print(f"   {name}: {total:>10.2f} руб.")
+    final_totals = db.get_user_totals()
+    for name, total_cents in final_totals:
+        print(f"   {name}: {total_cents / 100:>10.2f} руб.")
 
     print("\n" + "=" * 50)
     print("ДЕМОНСТРАЦИЯ ЗАВЕРШЕНА")
     print("=" * 50)
 
 
-def demonstrate_error_handling():
+def demonstrate_error_handling(db: PostgresDriver):
     """Демонстрация обработки ошибок"""
 
     print("\n\n" + "=" * 50)
     print("ДЕМОНСТРАЦИЯ ОБРАБОТКИ ОШИБОК")
     print("=" * 50)
 
-    db = PostgresDriver()
-
     # Попытка подключения с неверными данными
     print("\n1. Попытка подключения с неверным паролем:")
     print("-" * 40)
 
-    # Временно меняем пароль на неверный
-    import os
-    original_password = os.getenv("DB_PASSWORD")
-    os.environ["DB_PASSWORD"] = "wrong_password"
+    # Переопределяем пароль только для этого экземпляра драйвера
+    wrong_db = PostgresDriver(password="wrong_password")
 
-    if not db.connect():
+    if not wrong_db.connect():
         print("   ✅ Корректно обработана ошибка подключения")
 
-    # Восстанавливаем пароль
-    os.environ["DB_PASSWORD"] = original_password
-
-    # Подключаемся с правильным паролем
-    if db.connect():
-        print("\n2. Попытка добавить пользователя с некорректными данными:")
-        print("-" * 40)
-
-        # Возраст отрицательный (нарушение CHECK constraint)
-        user_id = db.add_user("Тестовый пользователь", -5)
-        if user_id is None:
-            print("   ✅ Корректно обработана ошибка CHECK constraint (возраст не может быть отрицательным)")
+    # Продолжаем с уже подключенным драйвером
+    print("\n2. Попытка добавить пользователя с некорректными данными:")
+    print("-" * 40)
 
-        # Некорректный user_id для заказа
-        order_id = db.add_order(99999, 100.00)  # Несуществующий user_id
-        if order_id is None:
-            print("   ✅ Корректно обработана ошибка foreign key constraint")
+    # Возраст отрицательный (нарушение CHECK constraint)
+    user_id = db.add_user("Тестовый пользователь", -5)
+    if user_id is None:
+        print("   ✅ Корректно обработана ошибка CHECK constraint (возраст не может быть отрицательным)")
 
-        db.disconnect()
+    # Некорректный user_id для заказа
+    order_id = db.add_order(99999, 10000)  # Несуществующий user_id
+    if order_id is None:
+        print("   ✅ Корректно обработана ошибка foreign key constraint")
 
 
 def main():
@@ -157,17 +157,22 @@ def main():
     print("\n🚀 ЗАПУСК ПРОГРАММЫ РАБОТЫ С POSTGRESQL")
 
     try:
-        # Демонстрация основных операций
-        demonstrate_crud_operations()
+        # Один драйвер (и общий пул соединений) на обе демонстрации
+        with PostgresDriver() as db:
+            # Демонстрация основных операций
+            demonstrate_crud_operations(db)
 
-        # Демонстрация обработки ошибок
-        demonstrate_error_handling()
+            # Демонстрация обработки ошибок
+            demonstrate_error_handling(db)
 
         print("\n✅ Программа выполнена успешно!")
 
     except Exception as e:
         print(f"\n❌ Критическая ошибка: {e}")
         return 1
+    finally:
+        # Закрываем соединения общего пула перед выходом
+        close_pools()
 
     return 0
 
@@ -1,90 +1,514 @@
+import io
 import os
-import psycopg2
-from psycopg2 import sql, Error
+import hashlib
+import threading
+from contextlib import contextmanager
+from itertools import groupby
+from operator import itemgetter
+from uuid import uuid4
+from psycopg2 import extensions, Error, InterfaceError
+from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
 from dotenv import load_dotenv
-from typing import List, Tuple, Optional
+from schema import SCHEMA_STATEMENTS, MIGRATE_ORDERS_AMOUNT_TO_CENTS, check_amount_cents
+from typing import Dict, Iterable, Iterator, List, Tuple, Optional, Set
 from datetime import datetime
 
 
+def _local_host(host: Optional[str], port: str) -> str:
+    """
+    Выбор адреса сервера: UNIX-сокет вместо TCP для локального PostgreSQL
+
+    Для localhost соединение через UNIX-сокет обходит TCP/IP-стек и дает
+    меньшую задержку на коротких запросах. Включается явно: каталог сокета
+    задается в DB_SOCKET_DIR (например, /var/run/postgresql), и сокет
+    используется, только если он там существует. По умолчанию - TCP, так как
+    для локальных подключений pg_hba.conf часто требует другой аутентификации (peer).
+
+    Args:
+        host: Значение DB_HOST
+        port: Порт сервера
+
+    Returns:
+        str: Каталог UNIX-сокета или исходный хост
+    """
+    socket_dir = os.getenv("DB_SOCKET_DIR", "")
+    if (host in (None, "", "localhost", "127.0.0.1") and socket_dir
+            and os.path.exists(os.path.join(socket_dir, f".s.PGSQL.{port}"))):
+        return socket_dir
+    return host or "localhost"
+
+
+# Параметры подключения читаются из окружения (.env) один раз при импорте модуля
+load_dotenv()
+_DB_PARAMS: Dict[str, str] = {
+    "host": _local_host(os.getenv("DB_HOST"), os.getenv("DB_PORT", "5432")),
+    "port": os.getenv("DB_PORT", "5432"),
+    "dbname": os.getenv("DB_NAME", "test"),
+    "user": os.getenv("DB_USER", "postgres"),
+    "password": os.getenv("DB_PASSWORD", ""),
+    # Настройки сессии передаются при установке соединения, без отдельных SET:
+    # JIT не окупается на коротких запросах, а подготовленные выражения
+    # сразу используют общий (закешированный) план без перепланирования
+    "options": "-c jit=off -c plan_cache_mode=force_generic_plan",
+}
+
+# Размер пула: DB_POOL_MIN соединений открываются сразу и держатся открытыми
+# (вместе с подготовленными на них выражениями), больше DB_POOL_MAX пул не выдает
+_POOL_MIN = int(os.getenv("DB_POOL_MIN", "10"))
+_POOL_MAX = int(os.getenv("DB_POOL_MAX", "20"))
+
+
+def _prepared_statement(param_types: Tuple[str, ...], query: str) -> Tuple[str, str, str]:
+    """
+    Описание серверного подготовленного выражения
+
+    Имя выражения детерминированно выводится из текста запроса и типов
+    параметров, поэтому совпадает на любом соединении.
+
+    Args:
+        param_types: Типы параметров PostgreSQL ($1, $2, ...)
+        query: Текст запроса с параметрами $1, $2, ...
+
+    Returns:
+        Tuple[str, str, str]: (имя, команда PREPARE, команда EXECUTE)
+    """
+    types = ", ".join(param_types)
+    name = "ps_" + hashlib.md5(f"{types}|{query}".encode()).hexdigest()[:16]
+    if not param_types:
+        return name, f"PREPARE {name} AS {query}", f"EXECUTE {name}"
+    placeholders = ", ".join(["%s"] * len(param_types))
+    return (
+        name,
+        f"PREPARE {name} ({types}) AS {query}",
+        f"EXECUTE {name} ({placeholders})"
+    )
+
+
+# Часто выполняемые запросы: разбираются и планируются сервером один раз на соединение
+_ADD_USER = _prepared_statement(
+    ("text", "integer"),
+    "INSERT INTO users (name, age) VALUES ($1, $2) RETURNING id"
+)
+_ADD_ORDER = _prepared_statement(
+    ("integer", "bigint"),
+    "INSERT INTO orders (user_id, amount_cents) VALUES ($1, $2) RETURNING id"
+)
+# Постраничная выборка заказов по ключу (id > последнего), без OFFSET;
+# обслуживается индексом idx_orders_user_id без обращения к таблице
+_GET_USER_ORDERS = _prepared_statement(
+    ("integer", "bigint"),
+    "SELECT id, amount_cents, created_at FROM orders WHERE user_id = $1 ORDER BY id LIMIT $2"
+)
+_GET_USER_ORDERS_AFTER = _prepared_statement(
+    ("integer", "integer", "bigint"),
+    "SELECT id, amount_cents, created_at FROM orders WHERE user_id = $1 AND id > $2 ORDER BY id LIMIT $3"
+)
+_GET_ORDERS_FOR_USERS = _prepared_statement(
+    ("integer[]",),
+    "SELECT user_id, id, amount_cents, created_at FROM orders WHERE user_id = ANY($1) ORDER BY user_id, id"
+)
+_DELETE_USER = _prepared_statement(
+    ("integer",),
+    "DELETE FROM users WHERE id = $1"
+)
+_GET_ALL_USERS = _prepared_statement(
+    ("bigint",),
+    "SELECT id, name, age FROM users ORDER BY id LIMIT $1"
+)
+_GET_ALL_USERS_AFTER = _prepared_statement(
+    ("integer", "bigint"),
+    "SELECT id, name, age FROM users WHERE id > $1 ORDER BY id LIMIT $2"
+)
+_GET_USER_TOTALS = _prepared_statement(
+    (),
+    "SELECT u.name, COALESCE(SUM(o.amount_cents), 0)::bigint AS total_cents"
+    " FROM users u LEFT JOIN orders o ON u.id = o.user_id"
+    " GROUP BY u.id, u.name"
+    " ORDER BY total_cents DESC, u.name"
+)
+# Пользователь и его заказы одним оператором (data-modifying CTE)
+_ADD_USER_WITH_ORDERS = _prepared_statement(
+    ("text", "integer", "bigint[]"),
+    "WITH new_user AS ("
+    " INSERT INTO users (name, age) VALUES ($1, $2) RETURNING id"
+    "), new_orders AS ("
+    " INSERT INTO orders (user_id, amount_cents)"
+    " SELECT new_user.id, amount_cents FROM new_user, unnest($3) AS amount_cents"
+    " RETURNING id"
+    ")"
+    " SELECT (SELECT id FROM new_user), ARRAY(SELECT id FROM new_orders ORDER BY id)"
+)
+
+# Шаблоны пакетной вставки для execute_values
+_SQL_ADD_USERS_BULK = "INSERT INTO users (name, age) VALUES %s RETURNING id"
+_SQL_ADD_ORDERS_BULK = "INSERT INTO orders (user_id, amount_cents) VALUES %s RETURNING id"
+
+# Пакетная вставка: строк в одном INSERT и ограничение на размер текста запроса
+_BULK_PAGE_SIZE = 1000
+_BULK_MAX_PAGE_BYTES = 1_000_000
+
+
+def _bulk_page_size(rows: List[tuple], page_size: Optional[int]) -> int:
+    """
+    Количество строк в одном INSERT для execute_values
+
+    Каждая страница отправляется отдельным запросом, поэтому страницы должны быть
+    крупными; но слишком длинный текст запроса (больше ~1 МБ) замедляет его
+    передачу и разбор. По умолчанию размер оценивается по первым строкам.
+
+    Args:
+        rows: Вставляемые строки
+        page_size: Явно заданный размер страницы или None для автоматического
+
+    Returns:
+        int: Размер страницы
+    """
+    if page_size is not None:
+        return page_size
+    sample = rows[:100]
+    avg_row_size = max(1, sum(len(repr(row)) for row in sample) // len(sample))
+    return max(1, min(_BULK_PAGE_SIZE, _BULK_MAX_PAGE_BYTES // avg_row_size))
+
+
+def _copy_text_field(value) -> str:
+    """Значение поля в текстовом формате COPY (NULL и экранирование спецсимволов)"""
+    if value is None:
+        return "\\N"
+    return (str(value)
+            .replace("\\", "\\\\")
+            .replace("\t", "\\t")
+            .replace("\n", "\\n")
+            .replace("\r", "\\r"))
+
+
+class _CopyRowsReader(io.TextIOBase):
+    """
+    Файлоподобный объект для COPY FROM STDIN, лениво формирующий данные из строк
+
+    Строки итератора преобразуются в текстовый формат COPY по мере чтения,
+    поэтому в памяти находится не более одного блока данных.
+    """
+
+    def __init__(self, rows: Iterable[tuple]):
+        self._rows = iter(rows)
+        self._pending = ""
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: Optional[int] = -1) -> str:
+        unlimited = size is None or size < 0
+        chunks = [self._pending]
+        length = len(self._pending)
+        for row in self._rows:
+            line = "\t".join(_copy_text_field(value) for value in row) + "\n"
+            chunks.append(line)
+            length += len(line)
+            if not unlimited and length >= size:
+                break
+        data = "".join(chunks)
+        if not unlimited and length > size:
+            data, self._pending = data[:size], data[size:]
+        else:
+            self._pending = ""
+        return data
+
+
+def _rollback_quietly(conn: extensions.connection) -> None:
+    """
+    Откат транзакции при обработке исключения
+
+    Если соединение уже разорвано, откат сам завершится ошибкой и заменит
+    исходное исключение; поэтому ошибки отката подавляются.
+
+    Args:
+        conn: Соединение с базой данных
+    """
+    if conn.closed:
+        return
+    try:
+        conn.rollback()
+    except Error:
+        pass
+
+
+class TransactionAborted(Error):
+    """Транзакция transaction() отменена: одна из операций в блоке завершилась ошибкой"""
+
+
+class _PooledConnection(extensions.connection):
+    """Соединение пула, запоминающее подготовленные на нем выражения"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared: Set[str] = set()
+        self._shared_cursor: Optional[extensions.cursor] = None
+
+    def shared_cursor(self) -> extensions.cursor:
+        """
+        Курсор, переиспользуемый операциями на этом соединении
+
+        Создается при первом обращении и закрывается вместе с соединением;
+        откат транзакции его не инвалидирует. Курсор хранит результат последней
+        команды, пока соединение простаивает в пуле, поэтому используется только
+        для команд с небольшим результатом (изменение данных, RETURNING id);
+        выборки открывают собственный курсор, освобождающий результат сразу.
+        """
+        if self._shared_cursor is None or self._shared_cursor.closed:
+            self._shared_cursor = self.cursor()
+        return self._shared_cursor
+
+
+# Пулы соединений общие для всех экземпляров драйвера (ключ - параметры подключения)
+_pools: Dict[tuple, ThreadedConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def _get_pool(minconn: int, maxconn: int, **params: str) -> ThreadedConnectionPool:
+    """
+    Получение пула соединений для указанных параметров подключения
+
+    Пул создается при первом обращении и далее переиспользуется,
+    поэтому повторные подключения не открывают новых backend-процессов.
+    minconn соединений открываются сразу и остаются открытыми в простое;
+    соединение сверх minconn закрывается при возврате в пул, и его
+    подготовленные выражения теряются. Пул не ждет освобождения соединений:
+    при maxconn одновременных операциях следующая получает PoolError,
+    который методы драйвера печатают и возвращают None/False/[].
+
+    Args:
+        minconn: Количество постоянно открытых соединений
+        maxconn: Максимальное количество соединений
+        **params: Параметры подключения psycopg2.connect
+
+    Returns:
+        ThreadedConnectionPool: Потокобезопасный пул соединений
+    """
+    key = (minconn, maxconn, *sorted(params.items()))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ThreadedConnectionPool(
+                minconn=minconn,
+                maxconn=maxconn,
+                connection_factory=_PooledConnection,
+                **params
+            )
+            _pools[key] = pool
+        return pool
+
+
+def close_pools() -> None:
+    """
+    Закрытие всех общих пулов соединений
+
+    Пулы живут до завершения процесса, удерживая открытые backend-процессы;
+    вызовите функцию при остановке приложения. Драйверы, подключенные к
+    закрытым пулам, нужно подключить заново (connect()).
+    """
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.closeall()
+        _pools.clear()
+
+
 class PostgresDriver:
     """Драйвер для работы с PostgreSQL"""
 
-    def __init__(self):
-        """Инициализация драйвера"""
-        load_dotenv()
-        self.connection = None
+    def __init__(self, minconn: int = _POOL_MIN, maxconn: int = _POOL_MAX,
+                 **connect_params: str):
+        """
+        Инициализация драйвера
+
+        Args:
+            minconn: Количество постоянно открытых соединений пула
+                (по умолчанию DB_POOL_MIN из окружения или 10)
+            maxconn: Максимальное количество соединений пула
+                (по умолчанию DB_POOL_MAX из окружения или 20)
+            **connect_params: Параметры подключения, переопределяющие значения
+                из окружения (host, port, dbname, user, password)
+        """
+        self._pool_size = (minconn, maxconn)
+        self._connect_params = {**_DB_PARAMS, **connect_params}
+        self._pool = None
+        # Соединение активной transaction() для каждого потока
+        self._local = threading.local()
 
     def connect(self) -> bool:
         """
-        Подключение к базе данных
+        Подключение к базе данных (получение общего пула соединений)
 
         Returns:
             bool: True если подключение успешно, False в противном случае
         """
         try:
-            self.connection = psycopg2.connect(
-                host=os.getenv("DB_HOST", "localhost"),
-                port=os.getenv("DB_PORT", "5432"),
-                dbname=os.getenv("DB_NAME", "test"),
-                user=os.getenv("DB_USER", "postgres"),
-                password=os.getenv("DB_PASSWORD", "")
-            )
+            self._pool = _get_pool(*self._pool_size, **self._connect_params)
             return True
         except Error as e:
             print(f"❌ Ошибка подключения: {e}")
             return False
 
     def disconnect(self) -> None:
-        """Закрытие соединения с базой данных"""
-        if self.connection:
-            self.connection.close()
-            self.connection = None
+        """
+        Отключение от пула соединений
+
+        Сам пул остается общим для других драйверов; закрыть все пулы
+        можно функцией close_pools().
+        """
+        self._pool = None
+
+    def _require_pool(self) -> ThreadedConnectionPool:
+        """
+        Пул соединений подключенного драйвера
+
+        Raises:
+            InterfaceError: Драйвер не подключен (например, ленивый результат
+                используется после выхода из блока with)
+        """
+        if self._pool is None:
+            raise InterfaceError("Драйвер не подключен к базе данных (вызовите connect())")
+        return self._pool
+
+    @contextmanager
+    def _connection(self, read_only: bool = False) -> Iterator[_PooledConnection]:
+        """
+        Выдача соединения на время одной операции
+
+        Внутри transaction() используется соединение транзакции, а фиксация
+        откладывается до конца блока. Иначе соединение берется из пула,
+        изменения фиксируются (или откатываются при ошибке базы данных),
+        и соединение возвращается в пул.
+
+        Args:
+            read_only: Операция только читает данные: выполняется в режиме
+                autocommit, без открытой транзакции, удерживающей снимок данных
+        """
+        conn = getattr(self._local, "connection", None)
+        if conn is not None:
+            yield conn
+            return
+
+        pool = self._require_pool()
+        conn = pool.getconn()
+        if read_only:
+            conn.autocommit = True
+        try:
+            yield conn
+            conn.commit()
+        except Error:
+            _rollback_quietly(conn)
+            raise
+        finally:
+            if read_only and not conn.closed:
+                conn.autocommit = False
+            pool.putconn(conn)
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Объединение нескольких операций в одну транзакцию с одним COMMIT
+
+        Все методы драйвера внутри блока (в текущем потоке) выполняются на одном
+        соединении, а изменения фиксируются один раз при выходе из блока.
+        Если одна из операций завершилась ошибкой, вся транзакция откатывается
+        и при выходе из блока выбрасывается TransactionAborted.
+        Вложенные блоки выполняются в рамках внешней транзакции.
+
+        Пример:
+            with db.transaction():
+                for name, age in users:
+                    db.add_user(name, age)
+        """
+        if getattr(self._local, "connection", None) is not None:
+            yield
+            return
+
+        pool = self._require_pool()
+        conn = pool.getconn()
+        self._local.connection = conn
+        try:
+            yield
+        except BaseException:
+            _rollback_quietly(conn)
+            raise
+        else:
+            if conn.info.transaction_status == extensions.TRANSACTION_STATUS_INERROR:
+                conn.rollback()
+                raise TransactionAborted("Транзакция отменена из-за ошибки в одной из операций")
+            conn.commit()
+        finally:
+            self._local.connection = None
+            pool.putconn(conn)
+
+    @staticmethod
+    def _execute_prepared(cursor, statement: Tuple[str, str, str], params: tuple) -> None:
+        """
+        Выполнение подготовленного выражения (PREPARE при первом использовании на соединении)
+
+        Args:
+            cursor: Курсор соединения из пула
+            statement: Описание выражения из _prepared_statement
+            params: Параметры запроса
+        """
+        name, prepare, execute = statement
+        prepared = cursor.connection.prepared
+        if name not in prepared:
+            cursor.execute(prepare)
+            prepared.add(name)
+        cursor.execute(execute, params)
 
     def __enter__(self):
-        """Контекстный менеджер для автоматического подключения"""
+        """Контекстный менеджер для автоматического получения пула соединений"""
         self.connect()
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        """Контекстный менеджер для автоматического отключения"""
+        """Контекстный менеджер для автоматического отключения от пула"""
         self.disconnect()
 
     def create_tables(self) -> bool:
         """
         Создание таблиц users и orders
 
+        Безопасно вызывать повторно. Если таблица orders существует в старом формате
+        (столбец amount NUMERIC в рублях), схема не создается и метод возвращает False:
+        сначала нужно явно вызвать migrate_amounts_to_cents().
+
         Returns:
             bool: True если таблицы созданы успешно
         """
         try:
-            with self.connection.cursor() as cursor:
-                # Создаем таблицу users
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS users (
-                        id   SERIAL PRIMARY KEY,
-                        name TEXT NOT NULL,
-                        age  INTEGER CHECK (age >= 0)
-                    );
-                """)
-
-                # Создаем таблицу orders
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS orders (
-                        id         SERIAL PRIMARY KEY,
-                        user_id    INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
-                        amount     NUMERIC(10,2) NOT NULL CHECK (amount >= 0),
-                        created_at TIMESTAMP DEFAULT NOW()
-                    );
-                """)
-
-                self.connection.commit()
+            with self._connection() as conn:
+                cursor = conn.shared_cursor()
+                for statement in SCHEMA_STATEMENTS:
+                    cursor.execute(statement)
                 return True
 
         except Error as e:
-            self.connection.rollback()
             print(f"❌ Ошибка при создании таблиц: {e}")
             return False
 
+    def migrate_amounts_to_cents(self) -> bool:
+        """
+        Перевод таблицы orders старого формата на суммы в копейках
+
+        Необратимо: столбец amount NUMERIC (рубли) переименовывается в amount_cents,
+        а значения умножаются на 100 и приводятся к BIGINT. На таблице нового
+        формата ничего не делает.
+
+        Returns:
+            bool: True если миграция выполнена успешно (или не требовалась)
+        """
+        try:
+            with self._connection() as conn:
+                conn.shared_cursor().execute(MIGRATE_ORDERS_AMOUNT_TO_CENTS)
+                return True
+
+        except Error as e:
+            print(f"❌ Ошибка при переводе сумм заказов в копейки: {e}")
+            return False
+
     def add_user(self, name: str, age: int) -> Optional[int]:
         """
         Добавление нового пользователя
@@ -97,107 +521,287 @@ class PostgresDriver:
             int: ID созданного пользователя или None в случае ошибки
         """
         try:
-            with self.connection.cursor() as cursor:
-                cursor.execute(
-                    "INSERT INTO users (name, age) VALUES (%s, %s) RETURNING id;",
-                    (name, age)
-                )
+            with self._connection() as conn:
+                cursor = conn.shared_cursor()
+                self._execute_prepared(cursor, _ADD_USER, (name, age))
                 user_id = cursor.fetchone()[0]
-                self.connection.commit()
                 return user_id
 
         except Error as e:
-            self.connection.rollback()
             print(f"❌ Ошибка при добавлении пользователя: {e}")
             return None
 
-    def add_order(self, user_id: int, amount: float) -> Optional[int]:
+    def add_users_bulk(self, users: List[Tuple[str, int]],
+                       page_size: Optional[int] = None) -> List[int]:
+        """
+        Пакетное добавление пользователей запросами INSERT ... VALUES (...), (...)
+
+        Args:
+            users: Список кортежей (имя, возраст)
+            page_size: Количество строк в одном INSERT (по умолчанию до 1000,
+                с учетом ограничения на размер запроса)
+
+        Returns:
+            List[int]: ID созданных пользователей в порядке добавления
+                или пустой список в случае ошибки
+        """
+        if not users:
+            return []
+
+        try:
+            with self._connection() as conn:
+                cursor = conn.shared_cursor()
+                rows = execute_values(
+                    cursor,
+                    _SQL_ADD_USERS_BULK,
+                    users,
+                    page_size=_bulk_page_size(users, page_size),
+                    fetch=True
+                )
+                return [row[0] for row in rows]
+
+        except Error as e:
+            print(f"❌ Ошибка при добавлении пользователей: {e}")
+            return []
+
+    def bulk_load_users(self, users: Iterable[Tuple[str, int]]) -> Optional[int]:
+        """
+        Массовая загрузка пользователей через COPY FROM STDIN
+
+        Быстрее пакетного INSERT для больших объемов: строки передаются потоком
+        без разбора и планирования отдельных операторов. Итератор читается
+        лениво, поэтому можно передавать генератор произвольной длины.
+
+        Args:
+            users: Итерируемый набор кортежей (имя, возраст)
+
+        Returns:
+            int: Количество загруженных пользователей или None в случае ошибки
+        """
+        try:
+            with self._connection() as conn:
+                cursor = conn.shared_cursor()
+                cursor.copy_expert("COPY users (name, age) FROM STDIN;", _CopyRowsReader(users))
+                return cursor.rowcount
+        except Error as e:
+            print(f"❌ Ошибка при загрузке пользователей: {e}")
+            return None
+
+    def add_order(self, user_id: int, amount_cents: int) -> Optional[int]:
         """
         Добавление нового заказа
 
         Args:
             user_id: ID пользователя
-            amount: Сумма заказа
+            amount_cents: Сумма заказа в копейках
 
         Returns:
             int: ID созданного заказа или None в случае ошибки
+
+        Raises:
+            TypeError: Сумма заказа не является целым числом копеек
         """
+        check_amount_cents(amount_cents)
         try:
-            with self.connection.cursor() as cursor:
-                cursor.execute(
-                    """INSERT INTO orders (user_id, amount) 
-                       VALUES (%s, %s) RETURNING id;""",
-                    (user_id, amount)
-                )
+            with self._connection() as conn:
+                cursor = conn.shared_cursor()
+                self._execute_prepared(cursor, _ADD_ORDER, (user_id, amount_cents))
                 order_id = cursor.fetchone()[0]
-                self.connection.commit()
                 return order_id
 
         except Error as e:
-            self.connection.rollback()
             print(f"❌ Ошибка при добавлении заказа: {e}")
             return None
 
-    def get_user_totals(self) -> List[Tuple[str, float]]:
+    def add_orders_bulk(self, orders: List[Tuple[int, int]],
+                        page_size: Optional[int] = None) -> List[int]:
+        """
+        Пакетное добавление заказов запросами INSERT ... VALUES (...), (...)
+
+        Args:
+            orders: Список кортежей (ID_пользователя, сумма_заказа_в_копейках)
+            page_size: Количество строк в одном INSERT (по умолчанию до 1000,
+                с учетом ограничения на размер запроса)
+
+        Returns:
+            List[int]: ID созданных заказов в порядке добавления
+                или пустой список в случае ошибки
+
+        Raises:
+            TypeError: Сумма одного из заказов не является целым числом копеек
+        """
+        if not orders:
+            return []
+
+        for _, amount_cents in orders:
+            check_amount_cents(amount_cents)
+
+        try:
+            with self._connection() as conn:
+                cursor = conn.shared_cursor()
+                rows = execute_values(
+                    cursor,
+                    _SQL_ADD_ORDERS_BULK,
+                    orders,
+                    page_size=_bulk_page_size(orders, page_size),
+                    fetch=True
+                )
+                return [row[0] for row in rows]
+
+        except Error as e:
+            print(f"❌ Ошибка при добавлении заказов: {e}")
+            return []
+
+    def add_user_with_orders(self, name: str, age: int,
+                             amounts_cents: List[int]) -> Optional[Tuple[int, List[int]]]:
+        """
+        Добавление пользователя вместе с его заказами за один запрос к серверу
+
+        Вставки объединены в один оператор через data-modifying CTE,
+        поэтому вся цепочка INSERT выполняется за один сетевой обмен.
+
+        Args:
+            name: Имя пользователя
+            age: Возраст пользователя
+            amounts_cents: Суммы заказов пользователя в копейках
+
+        Returns:
+            Tuple[int, List[int]]: (ID пользователя, ID созданных заказов)
+                или None в случае ошибки
+
+        Raises:
+            TypeError: Сумма одного из заказов не является целым числом копеек
+        """
+        amounts_cents = list(amounts_cents)
+        for amount_cents in amounts_cents:
+            check_amount_cents(amount_cents)
+        try:
+            with self._connection() as conn:
+                cursor = conn.shared_cursor()
+                self._execute_prepared(cursor, _ADD_USER_WITH_ORDERS, (name, age, amounts_cents))
+                user_id, order_ids = cursor.fetchone()
+                return user_id, order_ids
+
+        except Error as e:
+            print(f"❌ Ошибка при добавлении пользователя с заказами: {e}")
+            return None
+
+    def get_user_totals(self) -> List[Tuple[str, int]]:
         """
         Получение суммы заказов по каждому пользователю
 
         Returns:
-            List[Tuple[str, float]]: Список кортежей (имя_пользователя, сумма_заказов)
-        """
-        try:
-            with self.connection.cursor() as cursor:
-                cursor.execute("""
-                    SELECT 
-                        u.name,
-                        COALESCE(SUM(o.amount), 0) as total_amount
-                    FROM users u
-                    LEFT JOIN orders o ON u.id = o.user_id
-                    GROUP BY u.id, u.name
-                    ORDER BY total_amount DESC, u.name;
-                """)
+            List[Tuple[str, int]]: Список кортежей (имя_пользователя, сумма_заказов_в_копейках)
+        """
+        try:
+            with self._connection(read_only=True) as conn, conn.cursor() as cursor:
+                self._execute_prepared(cursor, _GET_USER_TOTALS, ())
                 return cursor.fetchall()
 
         except Error as e:
             print(f"❌ Ошибка при получении статистики: {e}")
             return []
 
-    def get_all_users(self) -> List[Tuple[int, str, int]]:
+    def get_all_users(self, limit: Optional[int] = None,
+                      after_id: Optional[int] = None) -> List[Tuple[int, str, int]]:
         """
-        Получение всех пользователей
+        Получение пользователей (постранично по возрастанию id)
+
+        Args:
+            limit: Максимальное количество пользователей (None - без ограничения)
+            after_id: ID последнего пользователя предыдущей страницы
 
         Returns:
-            List[Tuple[int, str, int]]: Список всех пользователей (id, name, age)
+            List[Tuple[int, str, int]]: Список пользователей (id, name, age)
         """
         try:
-            with self.connection.cursor() as cursor:
-                cursor.execute("SELECT id, name, age FROM users ORDER BY id;")
+            with self._connection(read_only=True) as conn, conn.cursor() as cursor:
+                if after_id is None:
+                    self._execute_prepared(cursor, _GET_ALL_USERS, (limit,))
+                else:
+                    self._execute_prepared(cursor, _GET_ALL_USERS_AFTER, (after_id, limit))
                 return cursor.fetchall()
         except Error as e:
             print(f"❌ Ошибка при получении пользователей: {e}")
             return []
 
-    def get_user_orders(self, user_id: int) -> List[Tuple[int, float, datetime]]:
+    def iter_users(self, itersize: int = 10000) -> Iterator[Tuple[int, str, int]]:
         """
-        Получение всех заказов пользователя
+        Потоковый обход всех пользователей через серверный (именованный) курсор
+
+        Строки подгружаются с сервера порциями по itersize, поэтому расход памяти
+        не зависит от размера таблицы.
+
+        Args:
+            itersize: Количество строк, получаемых с сервера за один FETCH
+
+        Yields:
+            Tuple[int, str, int]: Пользователь (id, name, age)
+        """
+        try:
+            # Имя курсора уникально: внутри transaction() несколько потоков выборки
+            # идут на одном соединении, и одинаковые имена конфликтовали бы
+            with self._connection() as conn, conn.cursor(name=f"stream_users_{uuid4().hex}") as cursor:
+                cursor.itersize = itersize
+                cursor.execute("SELECT id, name, age FROM users ORDER BY id;")
+                yield from cursor
+        except Error as e:
+            print(f"❌ Ошибка при получении пользователей: {e}")
+
+    def get_user_orders(self, user_id: int, limit: Optional[int] = 100,
+                        after_id: Optional[int] = None) -> List[Tuple[int, int, datetime]]:
+        """
+        Получение заказов пользователя (постранично по возрастанию id)
 
         Args:
             user_id: ID пользователя
+            limit: Максимальное количество заказов (None - без ограничения)
+            after_id: ID последнего заказа предыдущей страницы
 
         Returns:
-            List[Tuple[int, float, datetime]]: Список заказов (id, amount, created_at)
+            List[Tuple[int, int, datetime]]: Список заказов (id, amount_cents, created_at)
         """
         try:
-            with self.connection.cursor() as cursor:
-                cursor.execute(
-                    "SELECT id, amount, created_at FROM orders WHERE user_id = %s ORDER BY created_at;",
-                    (user_id,)
-                )
+            with self._connection(read_only=True) as conn, conn.cursor() as cursor:
+                if after_id is None:
+                    self._execute_prepared(cursor, _GET_USER_ORDERS, (user_id, limit))
+                else:
+                    self._execute_prepared(cursor, _GET_USER_ORDERS_AFTER, (user_id, after_id, limit))
                 return cursor.fetchall()
         except Error as e:
             print(f"❌ Ошибка при получении заказов пользователя: {e}")
             return []
 
+    def get_orders_for_users(self, user_ids: List[int]) -> Dict[int, List[Tuple[int, int, datetime]]]:
+        """
+        Получение заказов сразу нескольких пользователей одним запросом
+
+        Заменяет цикл вызовов get_user_orders (N запросов) одним запросом с ANY.
+
+        Args:
+            user_ids: ID пользователей
+
+        Returns:
+            Dict[int, List[Tuple[int, int, datetime]]]: Заказы (id, amount_cents, created_at)
+                по ID пользователя; для пользователей без заказов (и в случае ошибки) -
+                пустой список
+        """
+        orders_by_user: Dict[int, List[Tuple[int, int, datetime]]] = {
+            user_id: [] for user_id in user_ids
+        }
+        if not user_ids:
+            return orders_by_user
+
+        try:
+            with self._connection(read_only=True) as conn, conn.cursor() as cursor:
+                self._execute_prepared(cursor, _GET_ORDERS_FOR_USERS, (list(user_ids),))
+                for user_id, rows in groupby(cursor, key=itemgetter(0)):
+                    orders_by_user[user_id] = [row[1:] for row in rows]
+                return orders_by_user
+        except Error as e:
+            print(f"❌ Ошибка при получении заказов пользователей: {e}")
+            return orders_by_user
+
     def delete_user(self, user_id: int) -> bool:
         """
         Удаление пользователя (с каскадным удалением заказов)
@@ -209,29 +813,26 @@ class PostgresDriver:
             bool: True если удаление успешно
         """
         try:
-            with self.connection.cursor() as cursor:
-                cursor.execute("DELETE FROM users WHERE id = %s;", (user_id,))
-                self.connection.commit()
+            with self._connection() as conn:
+                cursor = conn.shared_cursor()
+                self._execute_prepared(cursor, _DELETE_USER, (user_id,))
                 return cursor.rowcount > 0
         except Error as e:
-            self.connection.rollback()
             print(f"❌ Ошибка при удалении пользователя: {e}")
             return False
 
     def clear_tables(self) -> bool:
         """
-        Очистка всех таблиц (удаление всех данных)
+        Очистка всех таблиц (удаление всех данных и сброс счетчиков id)
 
         Returns:
             bool: True если очистка успешна
         """
         try:
-            with self.connection.cursor() as cursor:
-                cursor.execute("DELETE FROM orders;")
-                cursor.execute("DELETE FROM users;")
-                self.connection.commit()
+            with self._connection() as conn:
+                cursor = conn.shared_cursor()
+                cursor.execute("TRUNCATE TABLE orders, users RESTART IDENTITY CASCADE;")
                 return True
         except Error as e:
-            self.connection.rollback()
             print(f"❌ Ошибка при очистке таблиц: {e}")
             return False
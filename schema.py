@@ -0,0 +1,81 @@
+"""
+Схема базы данных, общая для синхронного и асинхронного драйверов
+"""
+
+CREATE_USERS_TABLE = """
+    CREATE TABLE IF NOT EXISTS users (
+        id   SERIAL PRIMARY KEY,
+        name TEXT NOT NULL,
+        age  INTEGER CHECK (age >= 0)
+    );
+"""
+
+CREATE_ORDERS_TABLE = """
+    CREATE TABLE IF NOT EXISTS orders (
+        id           SERIAL PRIMARY KEY,
+        user_id      INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+        amount_cents BIGINT NOT NULL CHECK (amount_cents >= 0),
+        created_at   TIMESTAMP DEFAULT NOW()
+    );
+"""
+
+# Однократный перевод таблицы orders старого формата (amount NUMERIC(10,2), рубли)
+# на целые копейки: столбец переименовывается в amount_cents, значения умножаются на 100.
+# Выполняется только явно (migrate_amounts_to_cents), на таблице нового формата ничего не делает.
+MIGRATE_ORDERS_AMOUNT_TO_CENTS = """
+    DO $$
+    BEGIN
+        IF EXISTS (SELECT 1 FROM information_schema.columns
+                   WHERE table_schema = current_schema()
+                     AND table_name = 'orders' AND column_name = 'amount') THEN
+            ALTER TABLE orders RENAME COLUMN amount TO amount_cents;
+            ALTER TABLE orders ALTER COLUMN amount_cents TYPE BIGINT
+                USING (amount_cents * 100)::BIGINT;
+        END IF;
+    END $$;
+"""
+
+# Отказ создавать схему поверх таблицы orders старого формата, пока она не переведена на копейки
+CHECK_ORDERS_AMOUNT_MIGRATED = """
+    DO $$
+    BEGIN
+        IF EXISTS (SELECT 1 FROM information_schema.columns
+                   WHERE table_schema = current_schema()
+                     AND table_name = 'orders' AND column_name = 'amount') THEN
+            RAISE EXCEPTION 'Таблица orders хранит суммы в рублях (столбец amount), вызовите migrate_amounts_to_cents()';
+        END IF;
+    END $$;
+"""
+
+# Покрывающий индекс для постраничной выборки заказов пользователя
+CREATE_ORDERS_USER_ID_INDEX = """
+    CREATE INDEX IF NOT EXISTS idx_orders_user_id
+        ON orders (user_id, id) INCLUDE (amount_cents, created_at);
+"""
+
+# Команды создания схемы в порядке выполнения
+SCHEMA_STATEMENTS = (
+    CREATE_USERS_TABLE,
+    CREATE_ORDERS_TABLE,
+    CHECK_ORDERS_AMOUNT_MIGRATED,
+    CREATE_ORDERS_USER_ID_INDEX,
+)
+
+
+def check_amount_cents(amount_cents) -> None:
+    """
+    Проверка, что сумма заказа передана целым числом копеек
+
+    Без проверки сумма в рублях (например, 500.50) молча привелась бы к BIGINT
+    и сохранилась бы в 100 раз меньшей.
+
+    Args:
+        amount_cents: Сумма заказа в копейках
+
+    Raises:
+        TypeError: Сумма не является целым числом
+    """
+    if isinstance(amount_cents, bool) or not isinstance(amount_cents, int):
+        raise TypeError(
+            f"Сумма заказа должна быть целым числом копеек (int), получено: {amount_cents!r}"
+        )